@@ -1,17 +1,24 @@
 import sys
 import os
+import re
 import subprocess
 import numpy as np
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 from PySide6.QtWidgets import (QApplication, QMainWindow, QLabel, QPushButton, 
                              QFileDialog, QHBoxLayout, QVBoxLayout, 
                              QWidget, QFrame, QSplitter, QProgressBar, QComboBox,
                              QSpinBox, QCheckBox, QGridLayout, QGroupBox, QMessageBox)
-from PySide6.QtCore import Qt, QThread, Signal, QTimer
-from PySide6.QtGui import QPixmap, QImage, QFont
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal, QTimer
+from PySide6.QtGui import QPixmap, QImage, QImageReader, QFont
 import tempfile
 import shutil
 import json
+import ctypes
+import io
+import queue
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import qdarkstyle
@@ -19,50 +26,405 @@ try:
 except ImportError:
     has_qdarkstyle = False
 
-class NCNNUpscalerThread(QThread):
+try:
+    # pip install realesrgan-ncnn-py
+    import realesrgan_ncnn_py
+    has_ncnn_binding = True
+except ImportError:
+    has_ncnn_binding = False
+
+# Remembers where the NCNN executable was found on the last start
+NCNN_PATH_CACHE = os.path.join(os.path.expanduser("~"), ".realesrgan_ncnn_path.json")
+
+# Input formats accepted by the file dialog and for folder batches
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+
+# Progress line printed by realesrgan-ncnn-vulkan on stderr
+PROGRESS_RE = re.compile(r'\s*([\d.]+)%')
+
+# Loaded in-process engines, keyed by (models_dir, model_name, scale), least recently used first.
+# Every engine holds its model in VRAM, so only the last few selections are kept
+_ncnn_engines = OrderedDict()
+_ncnn_engines_lock = threading.Lock()
+MAX_NCNN_ENGINES = 2
+
+def get_ncnn_engine(models_dir, model_name, scale, gpu_id=0, tta=False):
+    """Return an in-process NCNN engine, loading the model only once"""
+    key = (models_dir, model_name, scale)
+    # Held while loading so a warm-up and a processing run never load twice
+    with _ncnn_engines_lock:
+        engine = _ncnn_engines.get(key)
+        if engine is not None:
+            _ncnn_engines.move_to_end(key)
+        else:
+            # model=-1 skips the built-in model so our own files can be loaded
+            engine = realesrgan_ncnn_py.Realesrgan(gpuid=gpu_id, tta_mode=tta, model=-1)
+            engine._load(
+                os.path.join(models_dir, f"{model_name}.param"),
+                os.path.join(models_dir, f"{model_name}.bin"),
+                scale
+            )
+            _ncnn_engines[key] = engine
+            while len(_ncnn_engines) > MAX_NCNN_ENGINES:
+                # A job still using an evicted engine keeps its own reference
+                _ncnn_engines.popitem(last=False)
+    return engine
+
+def upscale_tiled(engine, img, scale, tile=512, overlap=16):
+    """Upscale an RGB image tile by tile and stitch the results together"""
+    width, height = img.size
+    out = np.empty((height * scale, width * scale, 3), dtype=np.uint8)
+    
+    def prepare(x, y):
+        # Each tile carries `overlap` pixels of context on every side
+        box = (max(0, x - overlap), max(0, y - overlap),
+               min(width, x + tile + overlap), min(height, y + tile + overlap))
+        return x, y, box, img.crop(box)
+    
+    positions = iter([(x, y) for y in range(0, height, tile) for x in range(0, width, tile)])
+    
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # Crop the next tile while the engine works on the current one
+        pending = deque([pool.submit(prepare, *next(positions))])
+        while pending:
+            x, y, (left, top, right, bottom), tile_in = pending.popleft().result()
+            pos = next(positions, None)
+            if pos is not None:
+                pending.append(pool.submit(prepare, *pos))
+            
+            tile_out = np.asarray(engine.process_pil(tile_in))
+            
+            # Drop the overlap and paste the tile core into place
+            core_w, core_h = min(tile, width - x) * scale, min(tile, height - y) * scale
+            ox, oy = (x - left) * scale, (y - top) * scale
+            out[y * scale:y * scale + core_h, x * scale:x * scale + core_w] = tile_out[oy:oy + core_h, ox:ox + core_w]
+    
+    return Image.fromarray(out)
+
+# Free space left on tmpfs after a job's output is staged there
+STAGING_HEADROOM = 1 << 30
+
+def staging_dir(min_free=STAGING_HEADROOM):
+    """Pick a RAM-backed directory for NCNN output files, or None for the default"""
+    # The NCNN executable only reads and writes image files, so keep its
+    # output on tmpfs where there is room for large upscaled images
+    # (containers often mount a /dev/shm of only 64 MB)
+    if os.path.isdir('/dev/shm') and hasattr(os, 'statvfs'):
+        try:
+            stat = os.statvfs('/dev/shm')
+            if stat.f_bavail * stat.f_frsize >= min_free:
+                return '/dev/shm'
+        except OSError:
+            pass
+    return None
+
+def expected_output_size(paths, scale):
+    """Upper bound for the size of the upscaled files, from the input image headers"""
+    total = 0
+    for path in paths:
+        try:
+            with Image.open(path) as img:
+                width, height = img.size
+        except OSError:
+            continue
+        # Uncompressed RGB, which none of the output formats exceed by much
+        total += width * height * scale * scale * 3
+    return total
+
+def _clonefile(src, dst):
+    """Clone a file with macOS clonefile(2), True on success"""
+    try:
+        libsystem = ctypes.CDLL("/usr/lib/libSystem.dylib", use_errno=True)
+        return libsystem.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+def fast_copy(src, dst):
+    """Copy a file in the kernel (or as a copy-on-write clone) where possible"""
+    if sys.platform == "darwin" and _clonefile(src, dst):
+        return
+    
+    # copy_file_range can reflink on btrfs/XFS, sendfile still avoids user space buffers
+    for method in ("copy_file_range", "sendfile"):
+        if not hasattr(os, method):
+            continue
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                size = os.fstat(fsrc.fileno()).st_size
+                offset = 0
+                while offset < size:
+                    if method == "copy_file_range":
+                        copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - offset)
+                    else:
+                        copied = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+            if offset == size:
+                return
+        except OSError:
+            pass
+    
+    shutil.copy2(src, dst)
+
+def list_images(directory):
+    """Return the image files directly inside a folder, sorted by name"""
+    with os.scandir(directory) as entries:
+        return sorted(entry.path for entry in entries
+                      if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS))
+
+def read_many(paths, max_workers=8):
+    """Read several files concurrently and return their contents in order.
+    A file that cannot be read is returned as its OSError instead"""
+    def read(path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError as e:
+            return e
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths) or 1)) as pool:
+        return list(pool.map(read, paths))
+
+class UpscaleSignals(QObject):
     progress = Signal(int)
-    result = Signal(str)  # output image
+    result = Signal(object)  # output image path, PIL image or list of output paths
     finished = Signal()
     error = Signal(str)
+    skipped = Signal(list)  # "name: reason" for every input a batch could not decode
+
+class UpscaleRunnable(QRunnable):
+    """One upscale job, run on the app's upscale thread pool"""
     
-    def __init__(self, realesrgan_ncnn_path, input_path, output_path, scale=4, model_name="realesrgan-x4plus"):
+    # Number of decoded images kept ready ahead of the engine in batch mode
+    prefetch = 2
+    # Number of input files read together in batch mode
+    read_batch = 8
+    # Images larger than this on either side are upscaled in tiles
+    tile_size = 512
+    
+    def __init__(self, realesrgan_ncnn_path, input_path, output_path, scale=4, model_name="realesrgan-x4plus", models_dir=None,
+                 output_format="jpg", is_directory=False, job_dir_for=None):
         super().__init__()
+        # QRunnable is not a QObject, so its signals live on a helper object
+        self.signals = UpscaleSignals()
         self.realesrgan_ncnn_path = realesrgan_ncnn_path
+        self.output_format = output_format
         self.input_path = input_path
         self.output_path = output_path
         self.scale = scale
         self.model_name = model_name
+        self.models_dir = models_dir
+        self.is_directory = is_directory
+        # Called with the expected output size to create the directory the output
+        # path is relative to; if None, output_path is used as given
+        self.job_dir_for = job_dir_for
+        self.job_dir = None
+    
+    def prepare(self):
+        """List the inputs and choose the output directory, on the worker thread"""
+        input_path, output_path = self.input_path, self.output_path
+        # A list of input paths (with a matching list of output paths) runs as a batch
+        if self.is_directory:
+            images = list_images(input_path)
+        elif isinstance(input_path, (list, tuple)):
+            images = list(input_path)
+        else:
+            images = [input_path]
+        self.image_count = len(images)
+        
+        if self.job_dir_for is not None:
+            # Reading every image header of a folder takes a while, so the
+            # window only hands over the paths
+            self.job_dir = self.job_dir_for(expected_output_size(images, self.scale))
+            if isinstance(output_path, (list, tuple)):
+                output_path = [os.path.join(self.job_dir, path) for path in output_path]
+            else:
+                output_path = os.path.join(self.job_dir, output_path)
+            if self.is_directory:
+                os.makedirs(output_path, exist_ok=True)
+        
+        # Folders go to the executable as-is, so it loads the model once for all files
+        if self.is_directory and has_ncnn_binding and self.models_dir:
+            # The in-process engine runs a folder as a batch of files
+            self.is_directory = False
+            output_dir = output_path
+            input_path = images
+            output_path = [
+                os.path.join(output_dir, f"{os.path.splitext(os.path.basename(path))[0]}.{self.output_format}")
+                for path in images
+            ]
+        self.is_batch = isinstance(input_path, (list, tuple))
+        self.input_paths = list(input_path) if self.is_batch else [input_path]
+        self.output_paths = list(output_path) if self.is_batch else [output_path]
         
     def run(self):
         try:
-            self.progress.emit(10)
-            
+            self.prepare()
+            if has_ncnn_binding and self.models_dir:
+                self.run_in_process()
+            else:
+                self.run_executable()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+    
+    def run_in_process(self):
+        """Upscale through the Python binding, keeping the model loaded between runs"""
+        self.signals.progress.emit(10)
+        
+        engine = get_ncnn_engine(self.models_dir, self.model_name, self.scale)
+        
+        self.signals.progress.emit(30)
+        
+        if self.is_batch:
+            self.run_batch(engine)
+            return
+        
+        img = Image.open(self.input_paths[0]).convert('RGB')
+        output = self.upscale(engine, img)
+        
+        self.signals.progress.emit(90)
+        self.signals.result.emit(output)
+        self.signals.progress.emit(100)
+        self.signals.finished.emit()
+    
+    def upscale(self, engine, img):
+        if max(img.size) > self.tile_size:
+            return upscale_tiled(engine, img, self.scale, self.tile_size)
+        
+        return engine.process_pil(img)
+    
+    def run_batch(self, engine):
+        """Keep the engine busy while other threads decode and encode images"""
+        decoded = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        
+        def produce():
+            for start in range(0, len(self.input_paths), self.read_batch):
+                if stop.is_set():
+                    return
+                paths = self.input_paths[start:start + self.read_batch]
+                for offset, data in enumerate(read_many(paths)):
+                    if stop.is_set():
+                        return
+                    try:
+                        if isinstance(data, OSError):
+                            raise data
+                        img = Image.open(io.BytesIO(data)).convert('RGB')
+                    except UnidentifiedImageError:
+                        # PIL only names the BytesIO, so the file name is added here
+                        img = f"{os.path.basename(paths[offset])}: not a supported image"
+                    except Exception as e:
+                        img = f"{os.path.basename(paths[offset])}: {e}"
+                    decoded.put((start + offset, img))
+            decoded.put(None)
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        
+        total = len(self.input_paths)
+        written = []
+        skipped = []
+        try:
+            with ThreadPoolExecutor(max_workers=2) as writer:
+                pending = []
+                while True:
+                    item = decoded.get()
+                    if item is None:
+                        break
+                    idx, img = item
+                    self.signals.progress.emit(30 + 60 * (idx + 1) // total)
+                    if isinstance(img, str):
+                        # One broken file does not cost the rest of the batch
+                        skipped.append(img)
+                        continue
+                    
+                    output = self.upscale(engine, img)
+                    pending.append(writer.submit(output.save, self.output_paths[idx]))
+                    written.append(self.output_paths[idx])
+                
+                for future in pending:
+                    future.result()
+        finally:
+            stop.set()
+            while producer.is_alive():
+                try:
+                    decoded.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        
+        if not written:
+            raise ValueError("No image in the batch could be read:\n" + "\n".join(skipped))
+        if skipped:
+            self.signals.skipped.emit(skipped)
+        
+        self.signals.progress.emit(90)
+        self.signals.result.emit(written)
+        self.signals.progress.emit(100)
+        self.signals.finished.emit()
+    
+    def run_executable(self):
+        """Upscale by invoking the NCNN command line executable"""
+        self.signals.progress.emit(10)
+        
+        jobs = list(zip(self.input_paths, self.output_paths))
+        if self.is_directory:
+            total = max(1, self.image_count)
+        else:
+            total = len(jobs)
+        
+        finished_files = 0
+        for input_path, output_path in jobs:
             # Prepare command
             cmd = [
                 self.realesrgan_ncnn_path,
-                "-i", self.input_path,
-                "-o", self.output_path,
+                "-i", input_path,
+                "-o", output_path,
                 "-n", self.model_name,
                 "-s", str(self.scale),
-                "-f", "jpg"  # Output format
+                "-f", self.output_format
             ]
+            if self.models_dir:
+                cmd += ["-m", self.models_dir]
+            if self.is_directory:
+                # Verbose mode prints a "... done" line for every finished file
+                cmd.append("-v")
             
-            self.progress.emit(30)
+            proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                    text=True, bufsize=1)
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # The executable reports its own progress on stderr as "12.34%"
+            messages = []
+            for line in proc.stderr:
+                match = PROGRESS_RE.match(line)
+                if match:
+                    done = min(finished_files + float(match.group(1)) / 100, total)
+                    self.signals.progress.emit(10 + int(80 * done / total))
+                elif self.is_directory and line.rstrip().endswith("done"):
+                    finished_files += 1
+                else:
+                    messages.append(line)
+            proc.wait()
             
-            if result.returncode == 0:
-                self.progress.emit(90)
-                self.result.emit(self.output_path)
-                self.progress.emit(100)
-                self.finished.emit()
-            else:
-                self.error.emit(f"NCNN process failed: {result.stderr}")
-                
-        except Exception as e:
-            self.error.emit(str(e))
+            if proc.returncode != 0:
+                self.signals.error.emit(f"NCNN process failed: {''.join(messages)}")
+                return
+            
+            if not self.is_directory:
+                finished_files += 1
+        
+        self.signals.progress.emit(90)
+        if self.is_directory or not self.is_batch:
+            self.signals.result.emit(self.output_paths[0])
+        else:
+            self.signals.result.emit(self.output_paths)
+        self.signals.progress.emit(100)
+        self.signals.finished.emit()
 
 class RealESRGANNCNNApp(QMainWindow):
+    # Emitted from the probe thread with whether the NCNN executable works
+    ncnn_probed = Signal(bool)
+    
     def __init__(self):
         super().__init__()
         
@@ -70,7 +432,32 @@ class RealESRGANNCNNApp(QMainWindow):
         self.input_image = None
         self.output_image = None
         self.output_image_path = None
+        # Set when a folder is loaded instead of a single image
+        self.input_is_directory = False
+        self.output_image_paths = []
+        # Every job writes into its own directory below temp_dir / shm_temp_dir:
+        # the one holding the result on screen, and the one of the running job
+        self.output_job_dir = None
+        self.pending_job_dir = None
         self.temp_dir = tempfile.mkdtemp()
+        # RAM-backed counterpart of temp_dir, created once a job fits on tmpfs.
+        # Jobs create their directories on the upscale thread, hence the lock
+        self.shm_temp_dir = None
+        self.staging_lock = threading.Lock()
+        # A single long-lived worker: the GPU is the bottleneck, so jobs run
+        # one at a time and the thread is reused instead of created per click
+        self.upscale_pool = QThreadPool(self)
+        self.upscale_pool.setMaxThreadCount(1)
+        self.upscale_pool.setExpiryTimeout(-1)
+        self.upscale_job = None
+        # Browsing the model settings only loads the selection the user settles on
+        self.warm_up_timer = QTimer(self)
+        self.warm_up_timer.setSingleShot(True)
+        self.warm_up_timer.setInterval(500)
+        self.warm_up_timer.timeout.connect(self.warm_up_engine)
+        self.ncnn_probed.connect(self.handle_ncnn_probe)
+        # Last scaled pixmap per label: id(label) -> (image, width, height, pixmap)
+        self._scaled_cache = {}
         
         self.realesrgan_ncnn_path = self.find_ncnn_executable()
         
@@ -79,6 +466,7 @@ class RealESRGANNCNNApp(QMainWindow):
         self.setup_ui()
         
         self.check_ncnn_availability()
+        self.warm_up_engine()
 
     def find_ncnn_executable(self):
         """Find the Real-ESRGAN NCNN executable"""
@@ -91,6 +479,10 @@ class RealESRGANNCNNApp(QMainWindow):
         
         current_dir = os.path.dirname(os.path.abspath(__file__))
         
+        cached_path = self.load_cached_ncnn_path(current_dir)
+        if cached_path:
+            return cached_path
+        
         search_paths = [
             current_dir,
             os.path.join(current_dir, "bin"),
@@ -99,16 +491,85 @@ class RealESRGANNCNNApp(QMainWindow):
             os.path.join(current_dir, "realesrgan-ncnn-vulkan")
         ]
         
+        # One directory listing per search path instead of a stat per candidate
         for path in search_paths:
-            for name in possible_names:
-                full_path = os.path.join(path, name)
-                if os.path.exists(full_path):
-                    return full_path
+            try:
+                with os.scandir(path) as entries:
+                    names = {entry.name for entry in entries}
+            except OSError:
+                continue
+            
+            hit = next((name for name in possible_names if name in names), None)
+            if hit:
+                full_path = os.path.join(path, hit)
+                self.save_cached_ncnn_path(current_dir, full_path)
+                return full_path
         
         return None
+    
+    def load_cached_ncnn_path(self, app_dir):
+        """Return the cached executable path if it is still valid for this install"""
+        try:
+            with open(NCNN_PATH_CACHE, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("app_dir") == app_dir and os.stat(cache["path"]).st_mtime == cache["mtime"]:
+                return cache["path"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+        return None
+    
+    def save_cached_ncnn_path(self, app_dir, path):
+        try:
+            with open(NCNN_PATH_CACHE, "w", encoding="utf-8") as f:
+                json.dump({"app_dir": app_dir, "path": path, "mtime": os.stat(path).st_mtime}, f)
+        except OSError:
+            pass
+
+    def model_search_paths(self):
+        """Directories that may hold the .param/.bin model files"""
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        search_paths = [os.path.join(current_dir, "models")]
+        if self.realesrgan_ncnn_path:
+            search_paths.append(os.path.join(os.path.dirname(self.realesrgan_ncnn_path), "models"))
+        if has_ncnn_binding:
+            # The binding ships realesrgan-x4plus and realesrgan-x4plus-anime
+            search_paths.append(os.path.join(os.path.dirname(realesrgan_ncnn_py.__file__), "models"))
+        return search_paths
+    
+    def find_model_dir(self, model_name):
+        """Find the directory holding both model files, or None if no search path has them"""
+        # Checked per model: an empty or partial models folder must not hide
+        # the copies in the other search paths
+        for path in self.model_search_paths():
+            base = os.path.join(path, model_name)
+            if os.path.isfile(base + ".param") and os.path.isfile(base + ".bin"):
+                return path
+        
+        return None
+    
+    def has_int8_model(self, model_name):
+        """Check whether an INT8 quantized copy of the model is installed"""
+        return self.find_model_dir(f"{model_name}-int8") is not None
+    
+    def selected_model_name(self):
+        model_name = self.model_combo.currentText()
+        if self.int8_check.isChecked():
+            return f"{model_name}-int8"
+        return model_name
+    
+    def update_int8_option(self, *_):
+        """Only offer the INT8 toggle when the quantized model files exist"""
+        available = self.has_int8_model(self.model_combo.currentText())
+        self.int8_check.setEnabled(available)
+        if not available:
+            self.int8_check.setChecked(False)
 
     def check_ncnn_availability(self):
         """Check if NCNN executable is available"""
+        if has_ncnn_binding and self.find_model_dir(self.selected_model_name()):
+            self.statusBar().showMessage("NCNN in-process engine ready")
+            return True
+        
         if not self.realesrgan_ncnn_path:
             msg = QMessageBox()
             msg.setIcon(QMessageBox.Icon.Critical)
@@ -119,23 +580,68 @@ class RealESRGANNCNNApp(QMainWindow):
             self.statusBar().showMessage("NCNN executable not found")
             return False
         
+        if not (os.path.isfile(self.realesrgan_ncnn_path) and os.access(self.realesrgan_ncnn_path, os.X_OK)):
+            self.show_ncnn_warning()
+            return False
+        
+        # Running the executable initialises Vulkan and can take seconds, so the
+        # smoke test runs in the background instead of blocking the window
+        threading.Thread(target=self.probe_ncnn_executable, args=(self.realesrgan_ncnn_path,),
+                         daemon=True).start()
+        self.statusBar().showMessage("NCNN executable found")
+        return True
+    
+    def probe_ncnn_executable(self, path):
+        """Run the NCNN executable once to check that it actually works"""
+        ok = False
         try:
-            result = subprocess.run([self.realesrgan_ncnn_path, "-h"], 
+            result = subprocess.run([path, "-h"], 
                                   capture_output=True, text=True, timeout=10)
-            if result.returncode == 0 or "Usage:" in result.stdout or "Usage:" in result.stderr:
-                self.statusBar().showMessage("NCNN executable found and ready")
-                return True
+            ok = result.returncode == 0 or "Usage:" in result.stdout or "Usage:" in result.stderr
         except:
             pass
         
+        # Queued to the GUI thread, widgets must not be touched from here
+        self.ncnn_probed.emit(ok)
+    
+    def handle_ncnn_probe(self, ok):
+        if ok:
+            self.statusBar().showMessage("NCNN executable found and ready")
+        else:
+            self.show_ncnn_warning()
+    
+    def show_ncnn_warning(self):
         msg = QMessageBox()
         msg.setIcon(QMessageBox.Icon.Warning)
         msg.setText("NCNN Executable Issue")
         msg.setInformativeText("Found NCNN executable but it may not be working correctly. Please check your installation.")
         msg.setWindowTitle("Warning")
         msg.exec()
-        return False
 
+    def schedule_warm_up(self, *_):
+        # Restarting the timer on every change only warms up the final selection
+        self.warm_up_timer.start()
+    
+    def warm_up_engine(self, *_):
+        """Load the selected model in the background so the next run starts right away"""
+        if not has_ncnn_binding:
+            return
+        
+        model_name = self.selected_model_name()
+        models_dir = self.find_model_dir(model_name)
+        if not models_dir:
+            return
+        scale = int(self.scale_combo.currentText())
+        
+        def load():
+            try:
+                get_ncnn_engine(models_dir, model_name, scale)
+            except Exception:
+                # Reported by the upscale job if the model is really needed
+                pass
+        
+        threading.Thread(target=load, daemon=True).start()
+    
     def setup_ui(self):
         main_widget = QWidget()
         main_layout = QVBoxLayout(main_widget)
@@ -203,6 +709,10 @@ class RealESRGANNCNNApp(QMainWindow):
         self.load_btn.clicked.connect(self.load_image)
         input_controls.addWidget(self.load_btn)
         
+        self.load_folder_btn = QPushButton("Load Folder")
+        self.load_folder_btn.clicked.connect(self.load_folder)
+        input_controls.addWidget(self.load_folder_btn)
+        
         controls_layout.addWidget(input_group, 0, 0)
         
         model_group = QGroupBox("Model Settings")
@@ -228,6 +738,16 @@ class RealESRGANNCNNApp(QMainWindow):
         self.format_combo.addItems(["jpg", "png", "webp"])
         model_controls.addWidget(self.format_combo, 2, 1)
         
+        self.int8_check = QCheckBox("Fast (INT8)")
+        self.int8_check.setToolTip("Use the INT8 quantized model (<model>-int8.param/.bin) if installed")
+        model_controls.addWidget(self.int8_check, 3, 0, 1, 2)
+        self.update_int8_option()
+        
+        self.model_combo.currentTextChanged.connect(self.update_int8_option)
+        self.model_combo.currentTextChanged.connect(self.schedule_warm_up)
+        self.scale_combo.currentTextChanged.connect(self.schedule_warm_up)
+        self.int8_check.toggled.connect(self.schedule_warm_up)
+        
         controls_layout.addWidget(model_group, 0, 1, 2, 1)
         
         output_group = QGroupBox("Output Controls")
@@ -276,13 +796,14 @@ class RealESRGANNCNNApp(QMainWindow):
         if file_path:
             try:
                 self.input_image_path = file_path
-                self.input_image = Image.open(file_path).convert('RGB')
-                
-                self.display_image(self.input_image, self.input_image_view)
+                self.input_is_directory = False
+                # Processing reads the file itself, so only a preview sized
+                # decode is needed here
+                self.input_image = None
+                width, height = self.load_preview(file_path, self.input_image_view)
                 
                 self.process_btn.setEnabled(True)
                 
-                width, height = self.input_image.size
                 self.statusBar().showMessage(f"Loaded image: {os.path.basename(file_path)} ({width}x{height})")
                 self.status_label.setText(f"Image loaded: {width}x{height}")
             
@@ -296,14 +817,41 @@ class RealESRGANNCNNApp(QMainWindow):
                 msg.setWindowTitle("Error")
                 msg.exec()
     
-    def display_image(self, img, label):
-        if isinstance(img, str):
-            # If it's a path, load the image
-            img = Image.open(img).convert('RGB')
-        elif isinstance(img, np.ndarray):
-            # Convert numpy array to PIL Image
-            img = Image.fromarray(img)
+    def load_folder(self):
+        folder_path = QFileDialog.getExistingDirectory(self, "Open Folder")
         
+        if folder_path:
+            try:
+                count = len(list_images(folder_path))
+                if count == 0:
+                    raise ValueError("The folder does not contain any supported images")
+                
+                self.input_image_path = folder_path
+                self.input_is_directory = True
+                self.input_image = None
+                
+                # No preview for whole folders
+                self._scaled_cache.pop(id(self.input_image_view), None)
+                self.input_image_view.clear()
+                self.input_image_view.setText(f"Folder: {os.path.basename(folder_path)}\n{count} images")
+                
+                self.process_btn.setEnabled(True)
+                
+                self.statusBar().showMessage(f"Loaded folder: {os.path.basename(folder_path)} ({count} images)")
+                self.status_label.setText(f"Folder loaded: {count} images")
+            
+            except Exception as e:
+                self.statusBar().showMessage(f"Error loading folder: {str(e)}")
+                
+                msg = QMessageBox()
+                msg.setIcon(QMessageBox.Icon.Critical)
+                msg.setText("Folder Load Error")
+                msg.setInformativeText(f"Failed to load folder: {str(e)}")
+                msg.setWindowTitle("Error")
+                msg.exec()
+    
+    def label_size(self, label):
+        """Return the size available for a pixmap on the label"""
         # Get label dimensions
         label_width = label.width()
         label_height = label.height()
@@ -314,82 +862,256 @@ class RealESRGANNCNNApp(QMainWindow):
         if label_height <= 100:
             label_height = label.minimumHeight()
         
-        # Convert PIL Image to QImage
-        img_qt = img.convert("RGBA")
-        data = img_qt.tobytes("raw", "RGBA")
-        qim = QImage(data, img.width, img.height, QImage.Format.Format_RGBA8888)
+        return label_width, label_height
+    
+    def load_preview(self, path, label):
+        """Decode an image file at label size, show it and return its full size"""
+        label_width, label_height = self.label_size(label)
+        
+        reader = QImageReader(path)
+        size = reader.size()
+        if size.isValid():
+            target = size.scaled(label_width, label_height, Qt.AspectRatioMode.KeepAspectRatio)
+            if target.width() < size.width():
+                # Lets decoders such as libjpeg downscale while decoding
+                reader.setScaledSize(target)
+        
+        qim = reader.read()
+        if qim.isNull():
+            # Qt could not decode the file, PIL still can
+            return self.load_preview_pil(path, label)
+        if not size.isValid():
+            size = qim.size()
+        
+        pixmap = QPixmap.fromImage(qim)
+        if pixmap.width() > label_width or pixmap.height() > label_height:
+            pixmap = pixmap.scaled(label_width, label_height, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        
+        self._scaled_cache.pop(id(label), None)
+        label.setPixmap(pixmap)
+        
+        return size.width(), size.height()
+    
+    def load_preview_pil(self, path, label):
+        """Decode an image file with PIL at label size, show it and return its full size"""
+        with Image.open(path) as img:
+            size = img.size
+            # thumbnail() lets JPEG decode at a reduced size through draft()
+            img.thumbnail(self.label_size(label), Image.BILINEAR)
+            self.display_image(img, label)
+        return size
+    
+    def display_image(self, img, label):
+        if isinstance(img, str):
+            # If it's a path, decode only what the label can show
+            self.load_preview(img, label)
+            return
+        elif isinstance(img, np.ndarray):
+            # Convert numpy array to PIL Image
+            img = Image.fromarray(img)
+        
+        label_width, label_height = self.label_size(label)
+        
+        # Reuse the pixmap if this image was already scaled for this label size
+        cached = self._scaled_cache.get(id(label))
+        if cached is not None and cached[0] is img and cached[1:3] == (label_width, label_height):
+            label.setPixmap(cached[3])
+            return
+        source = img
+        
+        # Shrink large images to the label size first so the smooth filter
+        # below only has to work on a preview sized image
+        ratio = min(label_width / img.width, label_height / img.height)
+        if ratio < 1:
+            preview_size = (max(1, round(img.width * ratio)), max(1, round(img.height * ratio)))
+            img = img.resize(preview_size, Image.BILINEAR, reducing_gap=2.0)
+        
+        # Convert PIL Image to QImage. RGB and RGBA need no conversion, so the
+        # only copy is tobytes() of the image that is already preview sized
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        channels = len(img.mode)
+        data = img.tobytes()
+        fmt = QImage.Format.Format_RGB888 if img.mode == "RGB" else QImage.Format.Format_RGBA8888
+        # QImage only wraps data, which stays alive until fromImage has copied it
+        qim = QImage(data, img.width, img.height, img.width * channels, fmt)
         
         # Scale image to fit label while maintaining aspect ratio
         pixmap = QPixmap.fromImage(qim)
         pixmap = pixmap.scaled(label_width, label_height, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        self._scaled_cache[id(label)] = (source, label_width, label_height, pixmap)
         
         # Set pixmap to label
         label.setPixmap(pixmap)
     
     def process_image(self):
-        if self.input_image_path is None or self.realesrgan_ncnn_path is None:
+        if self.input_image_path is None:
+            return
+        
+        model_name = self.selected_model_name()
+        # Without the model files the job falls back to the executable
+        models_dir = self.find_model_dir(model_name)
+        if self.realesrgan_ncnn_path is None and not (has_ncnn_binding and models_dir):
+            msg = QMessageBox()
+            msg.setIcon(QMessageBox.Icon.Critical)
+            msg.setText("Model Not Found")
+            msg.setInformativeText(f"No models folder contains {model_name}.param and {model_name}.bin, and the NCNN executable is not available.")
+            msg.setWindowTitle("Error")
+            msg.exec()
             return
         
         self.process_btn.setEnabled(False)
         self.load_btn.setEnabled(False)
+        self.load_folder_btn.setEnabled(False)
         
         self.progress_bar.setValue(0)
         self.status_label.setText("Processing...")
         
         # Get settings
-        model_name = self.model_combo.currentText()
         scale = int(self.scale_combo.currentText())
         output_format = self.format_combo.currentText()
         
         input_basename = os.path.basename(self.input_image_path)
         name, _ = os.path.splitext(input_basename)
-        self.output_image_path = os.path.join(self.temp_dir, f"{name}_upscaled.{output_format}")
+        # Relative to the job directory, which the job creates once it knows its size
+        if self.input_is_directory:
+            output_path = f"{name}_upscaled"
+        else:
+            output_path = f"{name}_upscaled.{output_format}"
         
-        # Create thread for processing
-        self.upscaler_thread = NCNNUpscalerThread(
+        # Create job for processing
+        self.upscale_job = UpscaleRunnable(
             self.realesrgan_ncnn_path, 
             self.input_image_path, 
-            self.output_image_path, 
+            output_path, 
             scale, 
-            model_name
+            model_name,
+            models_dir,
+            output_format,
+            self.input_is_directory,
+            self.new_job_dir
         )
-        self.upscaler_thread.progress.connect(self.update_progress)
-        self.upscaler_thread.result.connect(self.handle_result)
-        self.upscaler_thread.finished.connect(self.processing_finished)
-        self.upscaler_thread.error.connect(self.handle_error)
+        self.upscale_job.signals.progress.connect(self.update_progress)
+        self.upscale_job.signals.result.connect(self.handle_result)
+        self.upscale_job.signals.finished.connect(self.processing_finished)
+        self.upscale_job.signals.error.connect(self.handle_error)
+        self.upscale_job.signals.skipped.connect(self.handle_skipped)
         
         # Start processing
         self.statusBar().showMessage("Processing image...")
-        self.upscaler_thread.start()
+        self.upscale_pool.start(self.upscale_job)
+    
+    def new_job_dir(self, expected_size):
+        """Create the output directory of the running job, called on the upscale thread"""
+        with self.staging_lock:
+            # A fresh directory per job never touches the current result, so that
+            # stays saveable until the new one replaces it
+            self.pending_job_dir = tempfile.mkdtemp(dir=self.output_dir_for(expected_size), prefix="job")
+            return self.pending_job_dir
+    
+    def output_dir_for(self, expected_size):
+        """Stage a job's output on tmpfs if it fits there with room to spare, else on disk"""
+        # Checked per job, a folder batch can need far more than a single image
+        shm = staging_dir(expected_size + STAGING_HEADROOM)
+        if shm is None:
+            return self.temp_dir
+        if self.shm_temp_dir is None:
+            self.shm_temp_dir = tempfile.mkdtemp(dir=shm)
+        return self.shm_temp_dir
     
     def update_progress(self, value):
         self.progress_bar.setValue(value)
         self.status_label.setText(f"Processing... {value}%")
     
-    def handle_result(self, output_path):
+    def handle_result(self, output):
+        previous_job_dir = self.output_job_dir
+        self.output_job_dir, self.pending_job_dir = self.pending_job_dir, None
+        
+        if isinstance(output, list) or (isinstance(output, str) and os.path.isdir(output)):
+            self.handle_batch_result(output)
+        else:
+            self.handle_single_result(output)
+        
+        # Remove the replaced result now instead of leaving it for closeEvent
+        self.discard_output(previous_job_dir)
+    
+    def handle_single_result(self, output):
+        self.output_image_paths = []
         try:
             # Load and display output image
-            self.output_image = Image.open(output_path).convert('RGB')
-            self.display_image(self.output_image, self.output_image_view)
+            if isinstance(output, str):
+                # Saving copies the file, so only a label sized preview is
+                # decoded and the size comes from the image header
+                self.output_image = None
+                self.output_image_path = output
+                width, height = self.load_preview(output, self.output_image_view)
+            else:
+                # In-process engine results never touch the disk
+                self.output_image = output
+                self.output_image_path = None
+                self.display_image(self.output_image, self.output_image_view)
+                width, height = self.output_image.size
             
             # Enable save button
             self.save_btn.setEnabled(True)
             
             # Update status with image dimensions
-            width, height = self.output_image.size
             self.statusBar().showMessage(f"Processing complete! Output size: {width}x{height}")
             self.status_label.setText(f"Complete! Output: {width}x{height}")
             
         except Exception as e:
             self.handle_error(f"Error loading result: {str(e)}")
     
+    def handle_batch_result(self, output):
+        try:
+            if isinstance(output, list):
+                self.output_image_paths = output
+                self.output_image_path = os.path.dirname(output[0]) if output else None
+            else:
+                self.output_image_paths = list_images(output)
+                self.output_image_path = output
+            self.output_image = None
+            
+            # Preview the first result of the batch
+            if self.output_image_paths:
+                self.display_image(self.output_image_paths[0], self.output_image_view)
+            
+            self.save_btn.setEnabled(bool(self.output_image_paths))
+            
+            count = len(self.output_image_paths)
+            self.statusBar().showMessage(f"Processing complete! {count} images upscaled")
+            self.status_label.setText(f"Complete! {count} images")
+            
+        except Exception as e:
+            self.handle_error(f"Error loading result: {str(e)}")
+    
+    def handle_skipped(self, skipped):
+        msg = QMessageBox()
+        msg.setIcon(QMessageBox.Icon.Warning)
+        msg.setText(f"{len(skipped)} images skipped")
+        msg.setInformativeText("These files could not be read and were left out of the batch:\n" + "\n".join(skipped))
+        msg.setWindowTitle("Warning")
+        msg.exec()
+    
+    def discard_output(self, job_dir):
+        """Delete the output directory of a job whose result is no longer needed"""
+        if not job_dir or os.path.dirname(job_dir) not in (self.temp_dir, self.shm_temp_dir):
+            return
+        shutil.rmtree(job_dir, ignore_errors=True)
+    
     def processing_finished(self):
         self.process_btn.setEnabled(True)
         self.load_btn.setEnabled(True)
+        self.load_folder_btn.setEnabled(True)
     
     def handle_error(self, error_msg):
+        # A failed job leaves the previous result in place, only its own output goes
+        self.discard_output(self.pending_job_dir)
+        self.pending_job_dir = None
+        
         self.process_btn.setEnabled(True)
         self.load_btn.setEnabled(True)
+        self.load_folder_btn.setEnabled(True)
         
         self.statusBar().showMessage(f"Error: {error_msg}")
         self.status_label.setText("Error occurred")
@@ -402,7 +1124,10 @@ class RealESRGANNCNNApp(QMainWindow):
         msg.exec()
     
     def save_image(self):
-        if self.output_image is None:
+        if self.output_image_paths:
+            self.save_images()
+            return
+        if self.output_image is None and self.output_image_path is None:
             return
         
         # Get default filename
@@ -418,8 +1143,8 @@ class RealESRGANNCNNApp(QMainWindow):
         if save_path:
             try:
                 # Copy the processed image to the selected location
-                if os.path.exists(self.output_image_path):
-                    shutil.copy2(self.output_image_path, save_path)
+                if self.output_image_path and os.path.exists(self.output_image_path):
+                    fast_copy(self.output_image_path, save_path)
                 else:
                     # Fallback: save using PIL
                     self.output_image.save(save_path)
@@ -437,16 +1162,48 @@ class RealESRGANNCNNApp(QMainWindow):
                 msg.setWindowTitle("Error")
                 msg.exec()
     
+    def save_images(self):
+        save_dir = QFileDialog.getExistingDirectory(self, "Save Images")
+        
+        if save_dir:
+            try:
+                for path in self.output_image_paths:
+                    fast_copy(path, os.path.join(save_dir, os.path.basename(path)))
+                
+                self.statusBar().showMessage(f"Saved {len(self.output_image_paths)} images to: {save_dir}")
+                self.status_label.setText("Images saved successfully")
+            
+            except Exception as e:
+                self.statusBar().showMessage(f"Error saving images: {str(e)}")
+                
+                msg = QMessageBox()
+                msg.setIcon(QMessageBox.Icon.Critical)
+                msg.setText("Save Error")
+                msg.setInformativeText(f"Failed to save images: {str(e)}")
+                msg.setWindowTitle("Error")
+                msg.exec()
+    
+    def resizeEvent(self, event):
+        """Drop scaled pixmaps, they no longer match the label sizes"""
+        self._scaled_cache.clear()
+        super().resizeEvent(event)
+    
     def closeEvent(self, event):
         """Clean up temporary directory"""
+        # Replaced results are deleted as they go, so this only removes the last one
         try:
             shutil.rmtree(self.temp_dir, ignore_errors=True)
+            with self.staging_lock:
+                if self.shm_temp_dir:
+                    shutil.rmtree(self.shm_temp_dir, ignore_errors=True)
         except:
             pass
         event.accept()
 
 def main():
     app = QApplication(sys.argv)
+    # Upscaled outputs easily exceed Qt's default 256 MB decode limit
+    QImageReader.setAllocationLimit(0)
     
     app.setApplicationName("Real-ESRGAN NCNN")
     app.setApplicationVersion("1.0")
@@ -30,17 +30,36 @@ a = Analysis(
         'PySide6.QtCore',
         'PySide6.QtGui', 
         'PySide6.QtWidgets',
-        'PIL._tkinter_finder',
-        'PIL.ImageTk',
-        'PIL.ImageDraw',
-        'PIL.ImageFont',
         'numpy',
         'qdarkstyle',
     ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=[
+        'tkinter',
+        'PIL.ImageTk',
+        'PIL._tkinter_finder',
+        'PyQt5',
+        'PyQt6',
+        'PySide6.Qt3DAnimation',
+        'PySide6.Qt3DCore',
+        'PySide6.Qt3DExtras',
+        'PySide6.Qt3DInput',
+        'PySide6.Qt3DLogic',
+        'PySide6.Qt3DRender',
+        'PySide6.QtCharts',
+        'PySide6.QtDataVisualization',
+        'PySide6.QtWebEngineCore',
+        'PySide6.QtWebEngineQuick',
+        'PySide6.QtWebEngineWidgets',
+        'PySide6.QtMultimedia',
+        'PySide6.QtMultimediaWidgets',
+        'PySide6.QtQuick',
+        'PySide6.QtQuick3D',
+        'PySide6.QtQuickControls2',
+        'PySide6.QtQuickWidgets',
+    ],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -58,7 +77,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -74,7 +93,7 @@ coll = COLLECT(
     a.zipfiles,
     a.datas,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
     name='RealESRGAN-NCNN',
 )
@@ -88,6 +107,36 @@ def build_executable():
     print("Building executable...")
     subprocess.run([sys.executable, "-m", "PyInstaller", "app_ncnn.spec", "--clean"])
 
+# Qt plugins the app actually loads, everything else is removed after the build
+KEEP_QT_PLUGINS = {
+    "platforms": {"qwindows", "qxcb", "qcocoa"},
+    # PNG and BMP support is built into QtGui, TIFF is needed for .tif previews
+    "imageformats": {"qjpeg", "qwebp", "qtiff"},
+}
+
+def prune_qt_plugins():
+    """Remove Qt plugins that PyInstaller bundled but the app never uses"""
+    exe_dir = Path("dist/RealESRGAN-NCNN")
+    if not exe_dir.exists():
+        return
+    
+    removed = 0
+    for plugin_dir in exe_dir.rglob("plugins"):
+        for kind, keep in KEEP_QT_PLUGINS.items():
+            kind_dir = plugin_dir / kind
+            if not kind_dir.is_dir():
+                continue
+            for plugin in kind_dir.iterdir():
+                # Plugin files are named e.g. qjpeg.dll, libqjpeg.so or libqjpeg.dylib
+                name = plugin.name.split(".")[0]
+                if name.startswith("lib"):
+                    name = name[3:]
+                if plugin.is_file() and name not in keep:
+                    plugin.unlink()
+                    removed += 1
+    
+    print(f"Removed {removed} unused Qt plugins")
+
 def create_distribution():
     """Create final distribution folder"""
     print("Creating distribution...")
@@ -189,6 +238,8 @@ def main():
         
         build_executable()
         
+        prune_qt_plugins()
+        
         create_distribution()
         
         print("\n" + "=" * 40)
@@ -1,40 +1,546 @@
 # download_dependencies.py - Script to download NCNN executable and models
 import os
-import requests
+import sys
+import time
+import hashlib
+import platform
+import asyncio
+import aiohttp
 import zipfile
 import shutil
+import tempfile
 from pathlib import Path
+from urllib.parse import urlparse
 import json
 
-def download_file(url, filename):
-    """Download a file with progress indication"""
-    print(f"Downloading {filename}...")
+try:
+    import orjson
+    has_orjson = True
+except ImportError:
+    has_orjson = False
+
+# Maximum number of downloads running at once, lower it on slow links
+DOWNLOAD_CONCURRENCY = int(os.environ.get("RESRGAN_DL_CONCURRENCY", "5"))
+# Set RESRGAN_DL_VERBOSE=1 to print the SHA-256 of files missing from EXPECTED_SHA256
+VERBOSE = bool(os.environ.get("RESRGAN_DL_VERBOSE"))
+SEM = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+
+# Read size for response bodies; large chunks keep the per-chunk Python overhead low
+CHUNK_SIZE = 1 << 20
+# Minimum seconds between progress updates
+PROGRESS_INTERVAL = 0.25
+
+# Archives up to this size are downloaded into memory instead of a temp file
+ZIP_SPOOL_SIZE = 128 << 20
+
+# NCNN release archive and executable name per platform.system().lower()
+# (you'll need to update these with actual release URLs); only platforms
+# with a known download are listed
+PLATFORM = {
+    "windows": (
+        "https://github.com/xinntao/Real-ESRGAN/releases/download/v0.2.5.0/realesrgan-ncnn-vulkan-20220424-windows.zip",
+        "realesrgan-ncnn-vulkan.exe",
+    ),
+    # "linux": ("https://github.com/xinntao/Real-ESRGAN/releases/download/v0.1.0/realesrgan-ncnn-vulkan-20220424-ubuntu.zip", "realesrgan-ncnn-vulkan"),
+    # "darwin": ("https://github.com/xinntao/Real-ESRGAN/releases/download/v0.1.0/realesrgan-ncnn-vulkan-20220424-macos.zip", "realesrgan-ncnn-vulkan"),
+}
+SYSTEM = platform.system().lower()
+
+# Model file sources: http(s) URLs are downloaded, anything else is a
+# local file that is copied into models/
+MODELS = {
+    "realesrgan-x4plus": {
+        "param": r"G:\realesrgen-app\realesrgan-ncnn-vulkan-20220424-windows\models\realesrgan-x4plus.param",
+        "bin": r"G:\realesrgen-app\realesrgan-ncnn-vulkan-20220424-windows\models\realesrgan-x4plus.bin"
+    },
+    "realesrgan-x4plus-anime": {
+        "param": r"G:\realesrgen-app\realesrgan-ncnn-vulkan-20220424-windows\models\realesrgan-x4plus-anime.param",
+        "bin": r"G:\realesrgen-app\realesrgan-ncnn-vulkan-20220424-windows\models\realesrgan-x4plus-anime.bin"
+    },
+    # "realesrnet-x4plus": {
+    #     "param": "https://github.com/xinntao/Real-ESRGAN/releases/download/v0.1.0/realesrnet-x4plus.param",
+    #     "bin": "https://github.com/xinntao/Real-ESRGAN/releases/download/v0.1.0/realesrnet-x4plus.bin"
+    # }
+}
+
+def is_url(source):
+    return urlparse(source).scheme in ("http", "https")
+
+# Local sources that do not exist, checked once so those models fail without any network traffic
+MISSING_SOURCES = {
+    source
+    for urls in MODELS.values()
+    for source in urls.values()
+    if not is_url(source) and not os.path.exists(source)
+}
+
+# Known SHA-256 digests by file name. A download whose digest does not
+# match is deleted. Entries come from a trusted download: run with
+# RESRGAN_DL_VERBOSE=1 and paste the printed lines here
+EXPECTED_SHA256 = {
+}
+
+# Files at least this large are fetched as RANGE_SLICES concurrent range
+# requests, which helps on CDNs that cap the throughput of each connection
+PARALLEL_MIN_SIZE = 8 << 20
+RANGE_SLICES = 4
+
+# Responses that are retried with exponential backoff, as are connection
+# errors and stalled transfers
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+
+# No limit on the whole transfer, large files on slow links take as long as
+# they take; only connecting and waiting for the next bytes are bounded
+TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+
+def create_session():
+    """Create an HTTP session whose connection pool matches the download limit"""
+    connector = aiohttp.TCPConnector(limit=DOWNLOAD_CONCURRENCY, limit_per_host=DOWNLOAD_CONCURRENCY)
+    return aiohttp.ClientSession(connector=connector, timeout=TIMEOUT)
+
+def meta_path(filename):
+    """Hidden sidecar file holding the HTTP validators of a downloaded file"""
+    path = Path(filename)
+    return path.with_name(f".{path.name}.meta.json")
+
+def load_meta(filename):
+    try:
+        with open(meta_path(filename), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_meta(filename, headers, size=None):
+    meta = {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified"), "size": size}
+    if any(meta.values()):
+        with open(meta_path(filename), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+async def download_file(session, url, filename, fileobj=None):
+    """Download a file with progress indication
     
-    response = requests.get(url, stream=True)
-    response.raise_for_status()
+    When fileobj is given the body is written there and filename only names the download.
+    """
+    headers = {}
+    part = Path(f"{filename}.part")
+    start = 0
+    if fileobj is None:
+        # A HEAD request costs far less than transferring a file that is already here
+        head = await fetch_head(session, url)
+        ranged = part.exists() and "slices" in load_meta(part)
+        if ranged or not (part.exists() or os.path.exists(filename)):
+            if head is not None and supports_ranges(head):
+                print(f"Downloading {filename} in {RANGE_SLICES} parts...")
+                try:
+                    await download_ranges(session, url, filename, part, head)
+                except RangesUnsupported as e:
+                    print(f"\n{e}, downloading it as one stream")
+                else:
+                    print(f"\nDownloaded: {filename}")
+                    return
+            if ranged:
+                # The slices cannot be continued as one stream, start over
+                part.unlink(missing_ok=True)
+                meta_path(part).unlink(missing_ok=True)
+        if not part.exists() and os.path.exists(filename):
+            if head is not None and is_current(filename, head):
+                print(f"Up to date: {filename}")
+                return
+            # Let the server answer 304 when the local copy is still current. The
+            # validators only describe the file as it was downloaded, so a copy
+            # whose size differs from that, or from the server's, is fetched again
+            meta = load_meta(filename)
+            local_size = os.path.getsize(filename)
+            remote_size = head.get('content-length') if head is not None else None
+            if meta.get("size") == local_size and remote_size in (None, str(local_size)):
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
     
-    total_size = int(response.headers.get('content-length', 0))
+    up_to_date = False
+    
+    async def attempt(final):
+        nonlocal headers, start, up_to_date
+        if fileobj is not None:
+            # Every attempt writes the whole body again
+            fileobj.seek(0)
+            fileobj.truncate()
+        elif part.exists():
+            # Continue from whatever an earlier run or attempt managed to write
+            headers, start = resume_headers(part)
+        
+        async with session.get(url, headers=headers) as response:
+            status = response.status
+            if status == 304:
+                up_to_date = True
+                return None
+            if status == 416 and start:
+                # The partial file is no prefix of the current one, start over
+                part.unlink()
+                headers, start = {}, 0
+                return "Server returned 416"
+            if status in RETRY_STATUSES and not final:
+                return f"Server returned {status}"
+            response.raise_for_status()
+            if fileobj is not None:
+                digest = await write_response(response, fileobj)
+                verify_digest(filename, digest)
+            else:
+                await save_response(response, filename, part, start if status == 206 else 0)
+        return None
+    
+    async with SEM:
+        print(f"Downloading {filename}...")
+        await with_retries(filename, attempt)
+    
+    if up_to_date:
+        print(f"Up to date: {filename}")
+    else:
+        print(f"\nDownloaded: {filename}")
+
+async def with_retries(name, attempt):
+    """Await attempt(final) until it succeeds, backing off exponentially in between
+    
+    attempt returns None when done, or the reason to try again (final is set
+    on the last try, so it can raise its own error instead). Connection errors
+    and timeouts are retried too; HTTP error statuses from raise_for_status are not.
+    """
+    for n in range(MAX_RETRIES + 1):
+        final = n == MAX_RETRIES
+        try:
+            reason = await attempt(final)
+            if reason is None:
+                return
+        except aiohttp.ClientResponseError:
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if final:
+                raise
+            reason = f"{type(e).__name__} {e}".rstrip()
+        if final:
+            raise ValueError(f"{reason} for {name}, giving up")
+        
+        delay = 2 ** n
+        print(f"\n{reason} for {name}, retrying in {delay}s...")
+        await asyncio.sleep(delay)
+
+def resume_headers(part):
+    """Range request headers continuing a .part file, and the offset they start at"""
+    start = part.stat().st_size
+    headers = {"Range": f"bytes={start}-"}
+    # If-Range restarts the download if the file changed since
+    meta = load_meta(part)
+    if meta.get("etag") or meta.get("last_modified"):
+        headers["If-Range"] = meta.get("etag") or meta["last_modified"]
+    return headers, start
+
+def wants_digest(filename):
+    """Whether the SHA-256 of a download is checked or printed at all"""
+    return VERBOSE or Path(filename).name in EXPECTED_SHA256
+
+def file_sha256(f, sha256=None):
+    """Feed the rest of an open binary file into a SHA-256 hash object"""
+    if sha256 is None:
+        sha256 = hashlib.sha256()
+    for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+        sha256.update(block)
+    return sha256
+
+async def save_response(response, filename, part, start):
+    """Write a response to filename through a .part file that can be resumed from start"""
+    # Remember the validators so a resumed request can send If-Range
+    save_meta(part, response.headers)
+    sha256 = hashlib.sha256()
+    if start:
+        # The digest has to cover the bytes downloaded by the earlier attempt too
+        with open(part, 'rb') as f:
+            await asyncio.to_thread(file_sha256, f, sha256)
+    
+    with open(part, 'ab' if start else 'wb') as f:
+        if not start:
+            preallocate(f, int(response.headers.get('content-length', 0)))
+        try:
+            digest = await write_response(response, f, start, sha256)
+        finally:
+            # Keep only the bytes that arrived, so the next attempt resumes at the right offset
+            f.truncate()
+        # fdatasync blocks until writeback finishes, keep it off the event loop
+        await asyncio.to_thread(drop_page_cache, f)
+    
+    finish_part(filename, part, digest, response.headers)
+
+def finish_part(filename, part, digest, headers):
+    """Verify a completed .part file and move it to filename"""
+    try:
+        if digest is not None:
+            verify_digest(filename, digest)
+    except ValueError:
+        part.unlink()
+        meta_path(part).unlink(missing_ok=True)
+        raise
+    os.replace(part, filename)
+    meta_path(part).unlink(missing_ok=True)
+    save_meta(filename, headers, os.path.getsize(filename))
+
+async def fetch_head(session, url):
+    """Return the response headers of a HEAD request, None if the server does not answer it"""
+    async def attempt(final):
+        nonlocal headers
+        async with SEM:
+            async with session.head(url, allow_redirects=True) as response:
+                if response.status in RETRY_STATUSES and not final:
+                    return f"Server returned {response.status}"
+                if response.status == 200:
+                    headers = response.headers
+        return None
+    
+    headers = None
+    try:
+        await with_retries(f"HEAD {url}", attempt)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        # The HEAD is only an optimisation, the GET retries on its own
+        return None
+    return headers
+
+def is_current(filename, headers):
+    """True if HEAD headers describe the file already at filename"""
+    size = headers.get('content-length')
+    if size is None or int(size) != os.path.getsize(filename):
+        return False
+    # The size alone can match a changed file, so the saved ETag has to agree too
+    etag = load_meta(filename).get("etag")
+    return etag is None or etag == headers.get("ETag")
+
+def supports_ranges(headers):
+    """True if a file is worth fetching as parallel range requests"""
+    return (
+        headers.get('Accept-Ranges') == 'bytes'
+        and int(headers.get('content-length', 0)) >= PARALLEL_MIN_SIZE
+    )
+
+class RangesUnsupported(ValueError):
+    """The server answered a range request with something other than that range"""
+
+def save_state(part, state):
+    """Record the validators and per-slice progress of a parallel download"""
+    path = meta_path(part)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    # Replaced in one step, so an interrupted write never loses the old state
+    os.replace(tmp, path)
+
+async def download_ranges(session, url, filename, part, headers):
+    """Download url into a preallocated .part file as concurrent range requests
+    
+    The sidecar of the .part file records how far each slice got, so an
+    interrupted download continues every slice where it stopped.
+    """
+    size = int(headers['content-length'])
+    state = load_meta(part)
+    validators = {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}
+    resumable = (
+        part.exists() and state.get("size") == size and state.get("slices")
+        and all(state.get(key) == value for key, value in validators.items())
+    )
+    if not resumable:
+        bounds = [size * i // RANGE_SLICES for i in range(RANGE_SLICES + 1)]
+        # [first byte, end, bytes written so far] per slice
+        state = {**validators, "size": size, "slices": [[lo, hi, 0] for lo, hi in zip(bounds, bounds[1:])]}
+        with open(part, 'wb') as f:
+            preallocate(f, size)
+        save_state(part, state)
+    
+    progress = Progress(size, sum(done for _, _, done in state["slices"]))
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for piece in state["slices"]:
+                tg.create_task(fetch_range(session, url, part, state, piece, progress))
+    except BaseExceptionGroup as group:
+        progress.cancel()
+        error = group.exceptions[0]
+        if isinstance(error, RangesUnsupported):
+            # A rerun would get the same answer, so leave nothing to resume
+            part.unlink(missing_ok=True)
+            meta_path(part).unlink(missing_ok=True)
+        else:
+            save_state(part, state)
+        # Report the failed slice rather than "unhandled errors in a TaskGroup"
+        raise error from None
+    except BaseException:
+        progress.cancel()
+        save_state(part, state)
+        raise
+    
+    # Slices arrive out of order, so any digest needs one pass over the finished file
+    def finish():
+        with open(part, 'rb') as f:
+            digest = file_sha256(f).hexdigest() if wants_digest(filename) else None
+            drop_page_cache(f)
+        return digest
+    
+    digest = await asyncio.to_thread(finish)
+    finish_part(filename, part, digest, headers)
+
+async def fetch_range(session, url, part, state, piece, progress):
+    """Download one slice of a parallel download into its place in the .part file
+    
+    piece is the slice's [first byte, end, bytes written] entry in state and
+    is updated as data arrives.
+    """
+    lo, hi, _ = piece
+    validator = state.get("etag") or state.get("last_modified")
+    
+    async def attempt(final):
+        offset = lo + piece[2]
+        if offset >= hi:
+            return None
+        headers = {"Range": f"bytes={offset}-{hi - 1}"}
+        if validator:
+            headers["If-Range"] = validator
+        
+        async with SEM:
+            async with session.get(url, headers=headers) as response:
+                if response.status in RETRY_STATUSES and not final:
+                    return f"Server returned {response.status}"
+                response.raise_for_status()
+                if response.status != 206:
+                    raise RangesUnsupported(f"Server did not return the requested range of {url}")
+                
+                # A handle per slice with its own position works on every platform
+                with open(part, 'r+b') as f:
+                    f.seek(offset)
+                    last_save = time.monotonic()
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        f.write(chunk)
+                        # Only count bytes that reached the OS, the state may be saved any time
+                        f.flush()
+                        piece[2] += len(chunk)
+                        progress.update(len(chunk))
+                        now = time.monotonic()
+                        if now - last_save >= PROGRESS_INTERVAL:
+                            save_state(part, state)
+                            last_save = now
+        
+        if lo + piece[2] < hi:
+            return f"Range {lo}-{hi - 1} ended early"
+        return None
+    
+    await with_retries(f"{part.name} bytes {lo}-{hi - 1}", attempt)
+
+class Progress:
+    """Byte counter of one download feeding a single shared progress line
+    
+    Concurrent downloads would overwrite each other's line, so the line shows
+    their combined progress and is written at most every PROGRESS_INTERVAL.
+    """
+    # Totals over every download of known size
+    total_size = 0
     downloaded = 0
+    last_print = 0.0
+    
+    def __init__(self, total_size, downloaded=0):
+        self.counted = total_size > 0
+        self.own_total = total_size
+        self.own_downloaded = downloaded
+        if self.counted:
+            Progress.total_size += total_size
+            Progress.downloaded += downloaded
+    
+    def cancel(self):
+        """Take a failed attempt back out of the totals, a retry counts again"""
+        if self.counted:
+            Progress.total_size -= self.own_total
+            Progress.downloaded -= self.own_downloaded
+            self.counted = False
+    
+    def update(self, n):
+        if not self.counted:
+            return
+        self.own_downloaded += n
+        Progress.downloaded += n
+        now = time.monotonic()
+        if now - Progress.last_print >= PROGRESS_INTERVAL or Progress.downloaded == Progress.total_size:
+            progress = (Progress.downloaded / Progress.total_size) * 100
+            sys.stdout.write(f"\rProgress: {progress:.1f}% of {Progress.total_size / (1 << 20):.1f} MiB")
+            sys.stdout.flush()
+            Progress.last_print = now
+
+def preallocate(f, size):
+    """Reserve the whole file up front so it is not extended chunk by chunk"""
+    if size <= 0:
+        return
+    try:
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(f.fileno(), 0, size)
+        else:
+            f.truncate(size)
+            f.seek(0)
+    except OSError:
+        # Not every filesystem supports preallocation, it is only a hint
+        pass
+
+def drop_page_cache(f):
+    """Tell the kernel the written file does not need to stay in the page cache"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    # Only clean pages can be dropped, so write the data out first
+    f.flush()
+    os.fdatasync(f.fileno())
+    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+def verify_digest(filename, digest):
+    """Check a SHA-256 hex digest against EXPECTED_SHA256"""
+    name = Path(filename).name
+    expected = EXPECTED_SHA256.get(name)
+    if expected is None:
+        if VERBOSE:
+            # Ready to paste into EXPECTED_SHA256
+            print(f'\n    "{name}": "{digest}",')
+    elif digest != expected.lower():
+        raise ValueError(f"SHA-256 mismatch for {name}: expected {expected}, got {digest}")
+
+async def write_response(response, f, offset=0, sha256=None):
+    """Stream a response body into an open binary file and return its SHA-256
     
-    with open(filename, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
-                f.write(chunk)
-                downloaded += len(chunk)
-                if total_size > 0:
-                    progress = (downloaded / total_size) * 100
-                    print(f"\rProgress: {progress:.1f}%", end='', flush=True)
-    
-    print(f"\nDownloaded: {filename}")
-
-def extract_zip(zip_path, extract_to):
-    """Extract ZIP file"""
-    print(f"Extracting {zip_path}...")
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(extract_to)
-    print(f"Extracted to: {extract_to}")
-
-def setup_ncnn_executable():
+    offset is the number of bytes already in the file when resuming a download,
+    sha256 a hash object that has already been fed those bytes.
+    """
+    total_size = int(response.headers.get('content-length', 0))
+    if total_size > 0:
+        total_size += offset
+    progress = Progress(total_size, offset)
+    # Hashing each chunk as it arrives avoids reading the file back afterwards
+    if sha256 is None:
+        sha256 = hashlib.sha256()
+    
+    try:
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            f.write(chunk)
+            sha256.update(chunk)
+            progress.update(len(chunk))
+    except BaseException:
+        progress.cancel()
+        raise
+    
+    return sha256.hexdigest()
+
+def extract_file(archive, member_name, dst):
+    """Extract the ZIP entry named member_name (in any folder) to dst, True if found"""
+    with zipfile.ZipFile(archive, 'r') as zip_ref:
+        # The central directory already lists every path, no need to unpack to search
+        entry = next((name for name in zip_ref.namelist()
+                      if name == member_name or name.endswith("/" + member_name)), None)
+        if entry is None:
+            return False
+        
+        with zip_ref.open(entry) as src, open(dst, 'wb') as out:
+            shutil.copyfileobj(src, out, 1 << 20)
+    return True
+
+async def setup_ncnn_executable_async(session):
     """Download and setup NCNN executable"""
     print("Setting up NCNN executable...")
     
@@ -42,57 +548,31 @@ def setup_ncnn_executable():
     bin_dir = Path("bin")
     bin_dir.mkdir(exist_ok=True)
     
-    # Download URLs (you'll need to update these with actual release URLs)
-    ncnn_urls = {
-        "windows": "https://github.com/xinntao/Real-ESRGAN/releases/download/v0.2.5.0/realesrgan-ncnn-vulkan-20220424-windows.zip",
-        # "linux": "https://github.com/xinntao/Real-ESRGAN/releases/download/v0.1.0/realesrgan-ncnn-vulkan-20220424-ubuntu.zip",
-        # "macos": "https://github.com/xinntao/Real-ESRGAN/releases/download/v0.1.0/realesrgan-ncnn-vulkan-20220424-macos.zip"
-    }
-    
-    # Detect platform
-    import platform
-    system = platform.system().lower()
-    
-    if system == "windows":
-        download_url = ncnn_urls["windows"]
-        executable_name = "realesrgan-ncnn-vulkan.exe"
-    elif system == "linux":
-        download_url = ncnn_urls["linux"]
-        executable_name = "realesrgan-ncnn-vulkan"
-    elif system == "darwin":
-        download_url = ncnn_urls["macos"]
-        executable_name = "realesrgan-ncnn-vulkan"
-    else:
-        print(f"Unsupported platform: {system}")
+    system = SYSTEM
+    if system not in PLATFORM:
+        print(f"Unsupported platform: {system} (no NCNN download configured)")
         return False
+    download_url, executable_name = PLATFORM[system]
     
     # Download NCNN package
     zip_filename = f"ncnn-{system}.zip"
+    dst = bin_dir / executable_name
     
     try:
-        download_file(download_url, zip_filename)
-        
-        # Extract
-        extract_zip(zip_filename, "temp_ncnn")
+        # Keep the archive in memory and unpack only the executable from it
+        with tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_SIZE) as archive:
+            await download_file(session, download_url, zip_filename, archive)
+            
+            archive.seek(0)
+            if not extract_file(archive, executable_name, dst):
+                print(f"{executable_name} not found in {zip_filename}")
+                return False
         
-        # Find and copy executable
-        for root, dirs, files in os.walk("temp_ncnn"):
-            for file in files:
-                if file == executable_name:
-                    src = os.path.join(root, file)
-                    dst = bin_dir / file
-                    shutil.copy2(src, dst)
-                    print(f"Copied executable: {dst}")
-                    
-                    # Make executable on Unix systems
-                    if system != "windows":
-                        os.chmod(dst, 0o755)
-                    
-                    break
+        print(f"Copied executable: {dst}")
         
-        # Cleanup
-        os.remove(zip_filename)
-        shutil.rmtree("temp_ncnn", ignore_errors=True)
+        # Make executable on Unix systems
+        if system != "windows":
+            os.chmod(dst, 0o755)
         
         return True
         
@@ -100,7 +580,21 @@ def setup_ncnn_executable():
         print(f"Error downloading NCNN executable: {e}")
         return False
 
-def setup_models():
+def copy_model_file(src, dst):
+    """Copy a local model file unless dst already matches it"""
+    stat = os.stat(src)
+    try:
+        current = os.stat(dst)
+        if current.st_size == stat.st_size and current.st_mtime >= stat.st_mtime:
+            print(f"Up to date: {dst}")
+            return
+    except FileNotFoundError:
+        pass
+    # copyfile uses in-kernel copies (sendfile / copy_file_range) where available
+    shutil.copyfile(src, dst)
+    print(f"Copied: {src} -> {dst}")
+
+async def setup_models_async(session):
     """Download and setup model files"""
     print("Setting up model files...")
     
@@ -108,38 +602,35 @@ def setup_models():
     models_dir = Path("models")
     models_dir.mkdir(exist_ok=True)
     
-    # Model download URLs
-    models = {
-        "realesrgan-x4plus": {
-            "param": "G:\realesrgen-app\realesrgan-ncnn-vulkan-20220424-windows\models\realesrgan-x4plus.param",
-            "bin": "G:\realesrgen-app\realesrgan-ncnn-vulkan-20220424-windows\models\realesrgan-x4plus.bin"
-        },
-        "realesrgan-x4plus-anime": {
-            "param": "G:\realesrgen-app\realesrgan-ncnn-vulkan-20220424-windows\models\realesrgan-x4plus-anime.param",
-            "bin": "G:\realesrgen-app\realesrgan-ncnn-vulkan-20220424-windows\models\realesrgan-x4plus-anime.bin"
-        },
-        # "realesrnet-x4plus": {
-        #     "param": "https://github.com/xinntao/Real-ESRGAN/releases/download/v0.1.0/realesrnet-x4plus.param",
-        #     "bin": "https://github.com/xinntao/Real-ESRGAN/releases/download/v0.1.0/realesrnet-x4plus.bin"
-        # }
-    }
+    failed = set()
     
-    success = True
-    for model_name, urls in models.items():
-        try:
-            # Download param file
-            param_file = models_dir / f"{model_name}.param"
-            download_file(urls["param"], param_file)
-            
-            # Download bin file
-            bin_file = models_dir / f"{model_name}.bin"
-            download_file(urls["bin"], bin_file)
-            
-        except Exception as e:
-            print(f"Error downloading {model_name}: {e}")
-            success = False
+    async def fetch_model(model_name, urls):
+        # The small param file downloads while the large bin file streams.
+        # Errors are recorded instead of raised so one failed model does not
+        # cancel the other downloads in the task group
+        jobs = []
+        for key in ("param", "bin"):
+            source, dst = urls[key], models_dir / f"{model_name}.{key}"
+            if is_url(source):
+                jobs.append(download_file(session, source, dst))
+            else:
+                jobs.append(asyncio.to_thread(copy_model_file, source, dst))
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Error downloading {model_name}: {result}")
+                failed.add(model_name)
+    
+    async with asyncio.TaskGroup() as tg:
+        for model_name, urls in MODELS.items():
+            missing = MISSING_SOURCES.intersection(urls.values())
+            if missing:
+                print(f"Error setting up {model_name}: file not found: {', '.join(sorted(missing))}")
+                failed.add(model_name)
+                continue
+            tg.create_task(fetch_model(model_name, urls))
     
-    return success
+    return not failed
 
 def create_config_file():
     """Create configuration file"""
@@ -169,27 +660,42 @@ def create_config_file():
         }
     }
     
-    with open("config.json", "w") as f:
-        json.dump(config, f, indent=2)
+    # orjson serializes in C; the output is the same indented JSON either way
+    if has_orjson:
+        data = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(config, indent=2).encode("utf-8")
+    with open("config.json", "wb") as f:
+        f.write(data)
     
     print("Created config.json")
 
-def main():
-    print("Real-ESRGAN NCNN Dependencies Setup")
-    print("=" * 40)
-    
-    try:
-        # Setup NCNN executable
-        if setup_ncnn_executable():
+async def main_async():
+    # One session for every download, so connections to the same host are reused
+    async with create_session() as session:
+        # The executable archive and the models are independent, fetch them at the same time
+        ncnn_ok, models_ok = await asyncio.gather(
+            setup_ncnn_executable_async(session),
+            setup_models_async(session),
+            return_exceptions=True
+        )
+        
+        if ncnn_ok is True:
             print("✓ NCNN executable setup completed")
         else:
-            print("✗ NCNN executable setup failed")
+            print("✗ NCNN executable setup failed" + (f": {ncnn_ok}" if isinstance(ncnn_ok, Exception) else ""))
         
-        # Setup models
-        if setup_models():
+        if models_ok is True:
             print("✓ Models setup completed")
         else:
-            print("✗ Models setup failed")
+            print("✗ Models setup failed" + (f": {models_ok}" if isinstance(models_ok, Exception) else ""))
+
+def main():
+    print("Real-ESRGAN NCNN Dependencies Setup")
+    print("=" * 40)
+    
+    try:
+        asyncio.run(main_async())
         
         # Create config file
         create_config_file()